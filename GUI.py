@@ -10,9 +10,13 @@ A simple e-commerce GUI using Tkinter:
 
 Author: ChatGPT (example)
 """
+import queue
+import re
+import threading
 import tkinter as tk
+from collections import OrderedDict, defaultdict
 from tkinter import ttk, messagebox
-import sqlite3
+from bisect import bisect_left
 from decimal import Decimal, ROUND_HALF_UP
 
 # ---------- Sample product data ----------
@@ -26,15 +30,37 @@ SAMPLE_PRODUCTS = [
 ]
 
 # ---------- Utilities ----------
-def fmt_price(p):
-    """Format price as 2-decimal string (rounding half up)."""
-    return f"${Decimal(p).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)}"
+def fmt_price_cents(c):
+    """Format a non-negative integer amount of cents as a price string."""
+    return f"${c // 100}.{c % 100:02d}"
+
+FILTER_CACHE_SIZE = 64  # (category, query) results kept for incremental search
+SEARCH_DEBOUNCE_MS = 150  # coalesce keystrokes before re-filtering
+DB_POLL_MS = 50  # how often the UI checks for finished background writes
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def _tokenize(text):
+    """Split text into lowercase word tokens for the search index."""
+    return _TOKEN_RE.findall(text.lower())
 
 # ---------- Simple persistence (SQLite) ----------
 DB_FILE = "orders.db"
+DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=memory",
+    "PRAGMA cache_size=-20000",
+)
 
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
+    """Open the long-lived orders connection, tune it and ensure the schema exists."""
+    import sqlite3  # deferred: the writer thread calls init_db on the first order
+    # autocommit mode: transactions are opened explicitly where we write
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    for pragma in DB_PRAGMAS:
+        conn.execute(pragma)
     c = conn.cursor()
     c.execute("""
     CREATE TABLE IF NOT EXISTS orders (
@@ -47,16 +73,31 @@ def init_db():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
-    conn.commit()
-    conn.close()
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS order_items (
+        order_id INTEGER NOT NULL REFERENCES orders(id),
+        product_id INTEGER NOT NULL,
+        qty INTEGER NOT NULL,
+        unit_price REAL NOT NULL
+    )
+    """)
+    return conn
 
-def save_order(customer_name, email, address, total, details):
-    conn = sqlite3.connect(DB_FILE)
+def save_order(conn, customer_name, email, address, total, details, items):
+    """Persist an order header and its cart items in a single write transaction."""
     c = conn.cursor()
-    c.execute("INSERT INTO orders (customer_name, email, address, total, details) VALUES (?, ?, ?, ?, ?)",
-              (customer_name, email, address, float(total), details))
-    conn.commit()
-    conn.close()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        c.execute("INSERT INTO orders (customer_name, email, address, total, details) VALUES (?, ?, ?, ?, ?)",
+                  (customer_name, email, address, float(total), details))
+        order_id = c.lastrowid
+        c.executemany("INSERT INTO order_items (order_id, product_id, qty, unit_price) VALUES (?, ?, ?, ?)",
+                      [(order_id, item.product.id, item.qty, item.product.price_cents / 100) for item in items])
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    c.execute("COMMIT")
+    return order_id
 
 # ---------- Core App ----------
 class Product:
@@ -65,8 +106,13 @@ class Product:
         self.name = name
         self.category = category
         self.price = Decimal(price)
+        self.price_cents = int((self.price * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+        self.price_str = fmt_price_cents(self.price_cents)
         self.stock = stock
         self.desc = desc
+        # lowercased once for search filtering
+        self._name_lower = name.lower()
+        self._desc_lower = desc.lower()
 
 class CartItem:
     def __init__(self, product: Product, qty=1):
@@ -74,8 +120,23 @@ class CartItem:
         self.qty = qty
 
     @property
-    def line_total(self):
-        return (self.product.price * self.qty).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    def qty(self):
+        return self._qty
+
+    @qty.setter
+    def qty(self, value):
+        self._qty = value
+        self._line_total_str = None  # recomputed lazily on next access
+
+    @property
+    def line_total_cents(self):
+        return self.product.price_cents * self.qty
+
+    @property
+    def line_total_str(self):
+        if self._line_total_str is None:
+            self._line_total_str = fmt_price_cents(self.line_total_cents)
+        return self._line_total_str
 
 class StoreApp(tk.Tk):
     def __init__(self, products_data):
@@ -83,10 +144,73 @@ class StoreApp(tk.Tk):
         self.title("Simple E-Commerce GUI")
         self.geometry("980x620")
         self.minsize(860, 520)
+        self._start_db_worker()
         self.products = [Product(**p) for p in products_data]
+        self._products_by_id = {p.id: p for p in self.products}
+        self._by_category = defaultdict(list)  # category -> [Product], catalog order
+        for p in self.products:
+            self._by_category[p.category].append(p)
+        self._categories = ["All"] + sorted(self._by_category)
+        self._build_search_index()
         self.cart = {}  # product.id -> CartItem
+        self._cart_subtotal_cents = 0  # kept in step with cart changes
+        self._filter_cache = OrderedDict()  # (category, query) -> [Product], LRU order
+        self._last_filter_key = None
+        self._pending_search = None  # after() id of a scheduled live-search refresh
         self._build_ui()
 
+    def destroy(self):
+        self._db_queue.put(None)  # let queued orders finish, then close the connection
+        self._db_worker.join()
+        super().destroy()
+
+    # ---------- background persistence ----------
+    def _start_db_worker(self):
+        self._db_queue = queue.Queue()    # (order args, on_done) or None to stop
+        self._db_results = queue.Queue()  # (on_done, error) back to the UI thread
+        self._db_pending = 0
+        self._db_worker = threading.Thread(target=self._db_worker_loop, daemon=True)
+        self._db_worker.start()
+
+    def _db_worker_loop(self):
+        # Runs on the worker thread; must not touch any Tk widget.
+        conn = None  # opened on the first order, so startup never touches SQLite
+        try:
+            while True:
+                job = self._db_queue.get()
+                if job is None:
+                    return
+                order, on_done = job
+                try:
+                    if conn is None:
+                        conn = init_db()
+                    save_order(conn, *order)
+                except Exception as exc:
+                    self._db_results.put((on_done, exc))
+                else:
+                    self._db_results.put((on_done, None))
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _submit_order(self, order, on_done):
+        """Queue save_order(conn, *order); on_done(error) runs on the UI thread afterwards."""
+        self._db_queue.put((order, on_done))
+        self._db_pending += 1
+        if self._db_pending == 1:
+            self.after(DB_POLL_MS, self._poll_db_results)
+
+    def _poll_db_results(self):
+        while True:
+            try:
+                on_done, error = self._db_results.get_nowait()
+            except queue.Empty:
+                break
+            self._db_pending -= 1
+            on_done(error)
+        if self._db_pending:
+            self.after(DB_POLL_MS, self._poll_db_results)
+
     def _build_ui(self):
         # Top frame: search + categories + cart button
         top = ttk.Frame(self, padding=(10, 8))
@@ -97,13 +221,13 @@ class StoreApp(tk.Tk):
         search_entry = ttk.Entry(top, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=(6, 12))
         search_entry.bind("<Return>", lambda e: self.refresh_products())
+        self.search_var.trace_add("write", self._on_search_change)
 
         ttk.Button(top, text="Search", command=self.refresh_products).pack(side=tk.LEFT)
 
         ttk.Label(top, text="   Category:").pack(side=tk.LEFT, padx=(12,0))
-        categories = ["All"] + sorted({p.category for p in self.products})
         self.category_var = tk.StringVar(value="All")
-        cat_menu = ttk.OptionMenu(top, self.category_var, "All", *categories, command=lambda _: self.refresh_products())
+        cat_menu = ttk.OptionMenu(top, self.category_var, "All", *self._categories, command=lambda _: self.refresh_products())
         cat_menu.pack(side=tk.LEFT, padx=(6, 6))
 
         # Spacer
@@ -118,7 +242,7 @@ class StoreApp(tk.Tk):
         content = ttk.Frame(self, padding=(10,6))
         content.pack(fill=tk.BOTH, expand=True)
 
-        # Left: product listing with a scrollable canvas
+        # Left: product listing in a scrollable treeview
         left = ttk.Frame(content)
         left.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
@@ -132,12 +256,18 @@ class StoreApp(tk.Tk):
         ttk.Label(right, text="Quick Cart Summary", font=("Segoe UI", 11, "bold")).pack(pady=(6,4))
         self.quick_cart_frame = ttk.Frame(right)
         self.quick_cart_frame.pack(fill=tk.X, padx=6)
+        # Placeholder and fixed controls are created once and only packed/unpacked
+        self._empty_cart_label = ttk.Label(self.quick_cart_frame, text="Cart empty")
+        self._quick_cart_rows = ttk.Frame(self.quick_cart_frame)
+        self._open_cart_btn = ttk.Button(self.quick_cart_frame, text="Open Cart", command=self.open_cart_window)
         self._refresh_quick_cart()
 
         ttk.Separator(right).pack(fill=tk.X, pady=(10,10))
         ttk.Label(right, text="Selected Product", font=("Segoe UI", 11, "bold")).pack(pady=(4,4))
         self.selected_frame = ttk.Frame(right)
         self.selected_frame.pack(fill=tk.BOTH, expand=True, padx=6)
+        self._selected_empty_label = ttk.Label(self.selected_frame, text="No product selected.\nSelect a product in the list.", justify=tk.CENTER)
+        self._selected_detail = ttk.Frame(self.selected_frame)
         self._render_selected_empty()
 
         # Initialize product view
@@ -145,94 +275,164 @@ class StoreApp(tk.Tk):
 
     # ---------- product list with scrollbar ----------
     def _create_product_list(self, parent):
-        canvas = tk.Canvas(parent)
-        scrollbar = ttk.Scrollbar(parent, orient="vertical", command=canvas.yview)
-        self.product_list_frame = ttk.Frame(canvas)
-
-        self.product_list_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        canvas.create_window((0,0), window=self.product_list_frame, anchor='nw')
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # A single Treeview is far cheaper to refresh than one frame of widgets per product
+        columns = ("name", "cat", "price", "stock")
+        self.product_tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="browse")
+        self.product_tree.heading("name", text="Product")
+        self.product_tree.heading("cat", text="Category")
+        self.product_tree.heading("price", text="Price")
+        self.product_tree.heading("stock", text="Stock")
+        self.product_tree.column("name", width=280)
+        self.product_tree.column("cat", width=120)
+        self.product_tree.column("price", width=90, anchor=tk.E)
+        self.product_tree.column("stock", width=70, anchor=tk.CENTER)
+        scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.product_tree.yview)
+        self.product_tree.configure(yscrollcommand=scrollbar.set)
+
+        self.product_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.product_tree.bind("<<TreeviewSelect>>", self._on_product_select)
+
+        # Every product gets one row up front; refreshes only detach and reattach them
+        for p in self.products:
+            self.product_tree.insert("", "end", iid=str(p.id), values=self._product_row_values(p))
+
+        self.no_products_label = ttk.Label(parent, text="No products found.", padding=12)
 
     # ---------- helpers to display products ----------
+    @staticmethod
+    def _product_row_values(p: Product):
+        return (p.name, p.category, p.price_str, p.stock)
+
+    def _update_product_row(self, p: Product):
+        self.product_tree.item(str(p.id), values=self._product_row_values(p))
+
+    def _on_search_change(self, *_):
+        if self._pending_search:
+            self.after_cancel(self._pending_search)
+        self._pending_search = self.after(SEARCH_DEBOUNCE_MS, self.refresh_products)
+
     def refresh_products(self):
-        # Clear current list
-        for w in self.product_list_frame.winfo_children():
-            w.destroy()
+        if self._pending_search:
+            # an explicit refresh (Return, Search button, category) supersedes the pending one
+            self.after_cancel(self._pending_search)
+            self._pending_search = None
+        tree = self.product_tree
+        tree.detach(*tree.get_children())
 
         q = self.search_var.get().strip().lower()
         cat = self.category_var.get()
-
-        matches = []
-        for p in self.products:
-            if cat != "All" and p.category != cat:
-                continue
-            if q and (q not in p.name.lower() and q not in p.desc.lower()):
-                continue
-            matches.append(p)
+        matches = self._filter_products(cat, q)
 
         if not matches:
-            ttk.Label(self.product_list_frame, text="No products found.", padding=12).pack()
+            self.no_products_label.place(relx=0.5, rely=0.1, anchor="n")
             return
+        self.no_products_label.place_forget()
 
-        for p in matches:
-            self._render_product_card(self.product_list_frame, p)
-
-    def _render_product_card(self, frame, product: Product):
-        card = ttk.Frame(frame, padding=10, relief="ridge")
-        card.pack(fill=tk.X, pady=6, padx=6)
-
-        # Header: name + price
-        header = ttk.Frame(card)
-        header.pack(fill=tk.X)
-        ttk.Label(header, text=product.name, font=("Segoe UI", 10, "bold")).pack(side=tk.LEFT)
-        ttk.Label(header, text=fmt_price(product.price), font=("Segoe UI", 10)).pack(side=tk.RIGHT)
-
-        # Sub info: category, stock
-        sub = ttk.Frame(card)
-        sub.pack(fill=tk.X, pady=(6,0))
-        ttk.Label(sub, text=f"Category: {product.category}").pack(side=tk.LEFT)
-        ttk.Label(sub, text=f"Stock: {product.stock}").pack(side=tk.RIGHT)
+        for index, p in enumerate(matches):
+            tree.move(str(p.id), "", index)
 
-        # Description
-        ttk.Label(card, text=product.desc, wraplength=640, foreground="#444").pack(pady=(6,8))
+    def _on_product_select(self, event=None):
+        sel = self.product_tree.selection()
+        if not sel:
+            return
+        self.open_product_detail(self._products_by_id[int(sel[0])])
+
+    def _build_search_index(self):
+        # Every suffix of every word is indexed, so "a word contains term" is a
+        # prefix lookup: bisect to the first suffix >= term and walk forward.
+        self._postings = defaultdict(set)  # word suffix -> indices into self.products
+        for i, p in enumerate(self.products):
+            for token in _tokenize(f"{p.name} {p.desc}"):
+                for k in range(len(token)):
+                    self._postings[token[k:]].add(i)
+        self._suffixes = sorted(self._postings)
+
+    def _search_index(self, q):
+        """Return indices of products with a word containing each word of q.
+
+        Each word of q lies inside a single word of any text containing q, so
+        this is a superset of the substring matches, never missing one.
+        """
+        suffixes = self._suffixes
+        result = None
+        for term in _tokenize(q):
+            hits = set()
+            i = bisect_left(suffixes, term)
+            while i < len(suffixes) and suffixes[i].startswith(term):
+                hits |= self._postings[suffixes[i]]
+                i += 1
+            result = hits if result is None else result & hits
+            if not result:
+                break
+        return result
+
+    def _filter_products(self, cat, q):
+        """Return products matching category and query, reusing earlier results.
+
+        Matches for a query are a subset of the matches for any prefix of it,
+        so when the user keeps typing we only rescan the previous result list.
+        Otherwise the word index narrows the candidates. Either way the final
+        test is the same substring check on name and description.
+        """
+        key = (cat, q)
+        cache = self._filter_cache
+        if key in cache:
+            cache.move_to_end(key)
+            self._last_filter_key = key
+            return cache[key]
+
+        source = self._by_category[cat] if cat != "All" else self.products
+        prev = self._last_filter_key
+        if (prev is not None and prev[0] == cat and prev[1] and q.startswith(prev[1])
+                and prev in cache):
+            source = cache[prev]
+        else:
+            candidates = self._search_index(q)  # None when q has no word characters
+            if candidates is not None:
+                products = self.products
+                source = [products[i] for i in sorted(candidates)]
+                if cat != "All":
+                    source = [p for p in source if p.category == cat]
+
+        if q:
+            matches = [p for p in source if q in p._name_lower or q in p._desc_lower]
+        else:
+            matches = source  # never mutated, so the list can be shared
 
-        # Actions
-        actions = ttk.Frame(card)
-        actions.pack(fill=tk.X)
-        ttk.Button(actions, text="View", command=lambda p=product: self.open_product_detail(p)).pack(side=tk.LEFT)
-        ttk.Button(actions, text="Add to Cart", command=lambda p=product: self.add_to_cart(p, 1)).pack(side=tk.LEFT, padx=(6,0))
+        cache[key] = matches
+        if len(cache) > FILTER_CACHE_SIZE:
+            cache.popitem(last=False)
+        self._last_filter_key = key
+        return matches
 
     # ---------- selected area ----------
     def _render_selected_empty(self):
-        for w in self.selected_frame.winfo_children():
-            w.destroy()
-        ttk.Label(self.selected_frame, text="No product selected.\nClick 'View' on any product.", justify=tk.CENTER).pack(expand=True)
+        self._selected_detail.pack_forget()
+        self._selected_empty_label.pack(expand=True)
 
     def open_product_detail(self, product: Product):
         # Update selected panel
-        for w in self.selected_frame.winfo_children():
+        self._selected_empty_label.pack_forget()
+        for w in self._selected_detail.winfo_children():
             w.destroy()
+        self._selected_detail.pack(fill=tk.BOTH, expand=True)
+        panel = self._selected_detail
 
-        ttk.Label(self.selected_frame, text=product.name, font=("Segoe UI", 11, "bold")).pack(anchor="w", pady=(6,4))
-        ttk.Label(self.selected_frame, text=f"Category: {product.category}").pack(anchor="w")
-        ttk.Label(self.selected_frame, text=f"Price: {fmt_price(product.price)}").pack(anchor="w", pady=(4,0))
-        ttk.Label(self.selected_frame, text=f"Stock: {product.stock}").pack(anchor="w", pady=(2,8))
-        ttk.Label(self.selected_frame, text=product.desc, wraplength=260, foreground="#333").pack(anchor="w", pady=(6,8))
+        ttk.Label(panel, text=product.name, font=("Segoe UI", 11, "bold")).pack(anchor="w", pady=(6,4))
+        ttk.Label(panel, text=f"Category: {product.category}").pack(anchor="w")
+        ttk.Label(panel, text=f"Price: {product.price_str}").pack(anchor="w", pady=(4,0))
+        ttk.Label(panel, text=f"Stock: {product.stock}").pack(anchor="w", pady=(2,8))
+        ttk.Label(panel, text=product.desc, wraplength=260, foreground="#333").pack(anchor="w", pady=(6,8))
 
-        qty_frame = ttk.Frame(self.selected_frame)
+        qty_frame = ttk.Frame(panel)
         qty_frame.pack(anchor="w", pady=(6,6))
         ttk.Label(qty_frame, text="Qty:").pack(side=tk.LEFT)
         qty_var = tk.IntVar(value=1)
         qty_spin = ttk.Spinbox(qty_frame, from_=1, to=max(1, product.stock), textvariable=qty_var, width=5)
         qty_spin.pack(side=tk.LEFT, padx=(6,10))
 
-        btns = ttk.Frame(self.selected_frame)
+        btns = ttk.Frame(panel)
         btns.pack(anchor="w", pady=(6,6))
         ttk.Button(btns, text="Add to Cart", command=lambda: (self.add_to_cart(product, qty_var.get()), messagebox.showinfo("Added", f"Added {qty_var.get()} × {product.name} to cart"))).pack(side=tk.LEFT)
         ttk.Button(btns, text="Open Detail Window", command=lambda p=product: self.open_product_popup(p)).pack(side=tk.LEFT, padx=(6,0))
@@ -243,7 +443,7 @@ class StoreApp(tk.Tk):
         popup.geometry("420x300")
         ttk.Label(popup, text=product.name, font=("Segoe UI", 12, "bold")).pack(pady=(8,6))
         ttk.Label(popup, text=f"Category: {product.category}").pack()
-        ttk.Label(popup, text=f"Price: {fmt_price(product.price)}").pack()
+        ttk.Label(popup, text=f"Price: {product.price_str}").pack()
         ttk.Label(popup, text=f"Stock: {product.stock}").pack(pady=(4,6))
         ttk.Label(popup, text=product.desc, wraplength=380).pack(pady=(6,12))
         qty_var = tk.IntVar(value=1)
@@ -264,32 +464,49 @@ class StoreApp(tk.Tk):
             if new_qty > product.stock:
                 messagebox.showwarning("Stock", "Not enough stock to increase quantity.")
                 return
-            self.cart[product.id].qty = new_qty
+            self._set_cart_qty(self.cart[product.id], new_qty)
         else:
-            self.cart[product.id] = CartItem(product, qty)
+            item = self.cart[product.id] = CartItem(product, qty)
+            self._cart_subtotal_cents += item.line_total_cents
         self._update_cart_button()
         self._refresh_quick_cart()
 
+    def _set_cart_qty(self, item: CartItem, qty: int):
+        self._cart_subtotal_cents += (qty - item.qty) * item.product.price_cents
+        item.qty = qty
+
+    def _remove_from_cart(self, pid: int):
+        self._cart_subtotal_cents -= self.cart.pop(pid).line_total_cents
+
+    def _clear_cart(self):
+        self.cart.clear()
+        self._cart_subtotal_cents = 0
+
     def _update_cart_button(self):
         total_items = sum(item.qty for item in self.cart.values())
         self.cart_btn.config(text=f"Cart ({total_items}) - View")
 
     def _refresh_quick_cart(self):
         # Clear quick cart
-        for w in self.quick_cart_frame.winfo_children():
+        for w in self._quick_cart_rows.winfo_children():
             w.destroy()
 
         if not self.cart:
-            ttk.Label(self.quick_cart_frame, text="Cart empty").pack()
+            self._quick_cart_rows.pack_forget()
+            self._open_cart_btn.pack_forget()
+            self._empty_cart_label.pack()
             return
+        self._empty_cart_label.pack_forget()
 
         for item in list(self.cart.values())[:5]:  # show up to 5 items
-            row = ttk.Frame(self.quick_cart_frame)
+            row = ttk.Frame(self._quick_cart_rows)
             row.pack(fill=tk.X, pady=3)
             ttk.Label(row, text=f"{item.qty} × {item.product.name}", wraplength=170).pack(side=tk.LEFT)
-            ttk.Label(row, text=fmt_price(item.line_total)).pack(side=tk.RIGHT)
+            ttk.Label(row, text=item.line_total_str).pack(side=tk.RIGHT)
 
-        ttk.Button(self.quick_cart_frame, text="Open Cart", command=self.open_cart_window).pack(pady=(6,0))
+        # re-packing in this order keeps the button below the rows
+        self._quick_cart_rows.pack(fill=tk.X)
+        self._open_cart_btn.pack(pady=(6,0))
 
     def open_cart_window(self):
         cart_win = tk.Toplevel(self)
@@ -309,6 +526,10 @@ class StoreApp(tk.Tk):
             ttk.Label(body, text="Your cart is empty.").pack()
             return
 
+        # Row values are built up front from the cached price strings
+        rows = [(str(item.product.id), (item.product.name, item.product.price_str, item.qty, item.line_total_str))
+                for item in self.cart.values()]
+
         # Treeview for cart
         columns = ("name", "price", "qty", "total")
         tree = ttk.Treeview(body, columns=columns, show="headings", selectmode="browse")
@@ -320,12 +541,11 @@ class StoreApp(tk.Tk):
         tree.column("price", width=100, anchor=tk.E)
         tree.column("qty", width=60, anchor=tk.CENTER)
         tree.column("total", width=100, anchor=tk.E)
-        tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
 
-        # Insert items
-        for item in self.cart.values():
-            tree.insert("", "end", iid=str(item.product.id),
-                        values=(item.product.name, fmt_price(item.product.price), item.qty, fmt_price(item.line_total)))
+        # Insert items before the tree is managed so it is laid out once, fully populated
+        for iid, values in rows:
+            tree.insert("", "end", iid=iid, values=values)
+        tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
 
         # Controls to change quantity / remove
         ctrl = ttk.Frame(body, padding=8)
@@ -354,8 +574,9 @@ class StoreApp(tk.Tk):
             if newq > prod.stock:
                 messagebox.showwarning("Stock", "Not enough stock for that quantity.")
                 return
-            self.cart[pid].qty = newq
-            tree.item(str(pid), values=(prod.name, fmt_price(prod.price), newq, fmt_price(self.cart[pid].line_total)))
+            self._set_cart_qty(self.cart[pid], newq)
+            tree.item(str(pid), values=(prod.name, prod.price_str, newq, self.cart[pid].line_total_str))
+            subtotal_label.config(text=f"Subtotal: {fmt_price_cents(self._cart_subtotal_cents)}")
             self._update_cart_button()
             self._refresh_quick_cart()
 
@@ -365,22 +586,23 @@ class StoreApp(tk.Tk):
                 messagebox.showinfo("Select", "Select an item to remove.")
                 return
             pid = int(sel[0])
-            del self.cart[pid]
+            self._remove_from_cart(pid)
             tree.delete(str(pid))
+            subtotal_label.config(text=f"Subtotal: {fmt_price_cents(self._cart_subtotal_cents)}")
             self._update_cart_button()
             self._refresh_quick_cart()
             if not self.cart:
                 cart_win.destroy()
 
-        tree.bind("<<TreeviewSelect>>", on_select_update(None))
+        tree.bind("<<TreeviewSelect>>", on_select_update)
         ttk.Button(ctrl, text="Update Qty", command=update_qty).pack(pady=(6,0))
         ttk.Button(ctrl, text="Remove Item", command=remove_item).pack(pady=(6,0))
 
         # Bottom: totals and checkout
         bottom = ttk.Frame(cart_win, padding=8)
         bottom.pack(fill=tk.X)
-        subtotal = sum(item.line_total for item in self.cart.values())
-        ttk.Label(bottom, text=f"Subtotal: {fmt_price(subtotal)}", font=("Segoe UI", 10, "bold")).pack(side=tk.LEFT)
+        subtotal_label = ttk.Label(bottom, text=f"Subtotal: {fmt_price_cents(self._cart_subtotal_cents)}", font=("Segoe UI", 10, "bold"))
+        subtotal_label.pack(side=tk.LEFT)
 
         ttk.Button(bottom, text="Checkout", command=lambda: (cart_win.destroy(), self.open_checkout_window())).pack(side=tk.RIGHT)
 
@@ -411,8 +633,8 @@ class StoreApp(tk.Tk):
 
         form.columnconfigure(1, weight=1)
 
-        subtotal = sum(item.line_total for item in self.cart.values())
-        ttk.Label(form, text=f"Order total: {fmt_price(subtotal)}", font=("Segoe UI", 10, "bold")).grid(row=3, column=1, sticky="e", pady=(8,12))
+        subtotal_cents = self._cart_subtotal_cents
+        ttk.Label(form, text=f"Order total: {fmt_price_cents(subtotal_cents)}", font=("Segoe UI", 10, "bold")).grid(row=3, column=1, sticky="e", pady=(8,12))
 
         def place_order():
             name = name_var.get().strip()
@@ -424,24 +646,42 @@ class StoreApp(tk.Tk):
             # Save order (mock)
             details_lines = []
             for item in self.cart.values():
-                details_lines.append(f"{item.qty}x {item.product.name} @ {fmt_price(item.product.price)} = {fmt_price(item.line_total)}")
+                details_lines.append(f"{item.qty}x {item.product.name} @ {item.product.price_str} = {item.line_total_str}")
             details = "\n".join(details_lines)
-            save_order(name, email, address, float(subtotal), details)
-            messagebox.showinfo("Order placed", f"Thanks {name}! Your order has been placed.")
-            # reduce stock locally
-            for item in list(self.cart.values()):
-                item.product.stock -= item.qty
-            self.cart.clear()
-            self._update_cart_button()
-            self._refresh_quick_cart()
-            self.refresh_products()
-            win.destroy()
 
-        ttk.Button(form, text="Place Order", command=place_order).grid(row=4, column=1, sticky="e", pady=(8,0))
+            ordered = [(item.product, item.qty) for item in self.cart.values()]
+
+            def on_saved(error):
+                win_open = win.winfo_exists()
+                if error is not None:
+                    # cart and stock are untouched, so the user can simply retry
+                    if win_open:
+                        win.grab_release()
+                        place_btn.state(["!disabled"])
+                    messagebox.showerror("Order failed", f"Your order could not be saved:\n{error}")
+                    return
+                # reduce stock locally
+                for product, qty in ordered:
+                    product.stock -= qty
+                    self._update_product_row(product)
+                self._clear_cart()
+                self._update_cart_button()
+                self._refresh_quick_cart()
+                self.refresh_products()
+                if win_open:
+                    win.destroy()
+                messagebox.showinfo("Order placed", f"Thanks {name}! Your order has been placed.")
+
+            # keep the cart frozen until the write has finished
+            place_btn.state(["disabled"])
+            win.grab_set()
+            self._submit_order((name, email, address, subtotal_cents / 100, details, list(self.cart.values())), on_saved)
+
+        place_btn = ttk.Button(form, text="Place Order", command=place_order)
+        place_btn.grid(row=4, column=1, sticky="e", pady=(8,0))
 
 # ---------- Boot ----------
 def main():
-    init_db()
     app = StoreApp(SAMPLE_PRODUCTS)
     app.mainloop()
 
@@ -1,50 +1,71 @@
+import hashlib
+import hmac
+import os
 import tkinter as tk
 from tkinter import messagebox
 import mysql.connector
+from mysql.connector import pooling
+
+# Expected table (passwords are never stored, only a salted scrypt hash):
+#   CREATE TABLE users (
+#       username VARCHAR(64) NOT NULL UNIQUE,
+#       pwd_hash BINARY(32) NOT NULL,
+#       salt BINARY(16) NOT NULL
+#   );
+
+_pool = None  # created on first use, then shared by every login/register
 
 # Database connection function
 def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",      # Change if not running locally
-        user="root",           # Your MySQL username
-        password="pass124**",  # Your MySQL password
-        database="login_system"   # The database we created
-    )
+    """Borrow a connection from the pool; close() hands it back."""
+    global _pool
+    if _pool is None:
+        _pool = pooling.MySQLConnectionPool(
+            pool_name="auth_pool",
+            pool_size=5,
+            host="localhost",      # Change if not running locally
+            user="root",           # Your MySQL username
+            password="pass124**",  # Your MySQL password
+            database="login_system"   # The database we created
+        )
+    return _pool.get_connection()
+
+# Password hashing
+def hash_password(password, salt):
+    return hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1, dklen=32)
 
 # Function to handle login
-def login():
-    entered_username = username_entry.get()
-    entered_password = password_entry.get()
-
+def login(entered_username, entered_password):
     conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT * FROM users WHERE username=%s AND password=%s",
-                   (entered_username, entered_password))
-    result = cursor.fetchone()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT salt, pwd_hash FROM users WHERE username=%s",
+                       (entered_username,))
+        row = cursor.fetchone()
+    finally:
+        conn.close()
 
-    if result:
+    # Hash even for unknown users so response time doesn't reveal which names exist
+    salt, stored_hash = (bytes(row[0]), bytes(row[1])) if row else (os.urandom(16), b"")
+    if hmac.compare_digest(hash_password(entered_password, salt), stored_hash):
         messagebox.showinfo("Login Success", f"Welcome, {entered_username}!")
     else:
         messagebox.showerror("Login Failed", "Invalid Username or Password!")
 
-    conn.close()
-
 # Function to register a new user
-def register():
-    entered_username = username_entry.get()
-    entered_password = password_entry.get()
-
+def register(entered_username, entered_password):
     if not entered_username or not entered_password:
         messagebox.showwarning("Input Error", "Username and Password cannot be empty.")
         return
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    salt = os.urandom(16)
+    pwd_hash = hash_password(entered_password, salt)
 
+    conn = get_db_connection()
     try:
-        cursor.execute("INSERT INTO users (username, password) VALUES (%s, %s)",
-                       (entered_username, entered_password))
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO users (username, pwd_hash, salt) VALUES (%s, %s, %s)",
+                       (entered_username, pwd_hash, salt))
         conn.commit()
         messagebox.showinfo("Registration Success", f"User '{entered_username}' registered successfully!")
     except mysql.connector.IntegrityError:
@@ -52,26 +73,39 @@ def register():
     finally:
         conn.close()
 
-# Main window
-root = tk.Tk()
-root.title("J_TECH.COM")
-root.geometry("350x250")
-root.resizable(False, False)
-
-
-# Username label & entry
-tk.Label(root, text="Username:").pack(pady=5)
-username_entry = tk.Entry(root, width=30)
-username_entry.pack(pady=5)
-
-# Password label & entry
-tk.Label(root, text="Password:").pack(pady=5)
-password_entry = tk.Entry(root, show="*", width=30)
-password_entry.pack(pady=5)
-
-# Buttons
-tk.Button(root, text="Login", command=login, width=15, bg="blue", fg="white").pack(pady=10)
-tk.Button(root, text="Register", command=register, width=15, bg="green", fg="white").pack(pady=5)
-
-# Run the application
-root.mainloop()
+def run_login(master=None):
+    """Show the login window.
+
+    With a master the window is a Toplevel of that app, sharing its Tcl
+    interpreter and event loop; otherwise it gets its own root and mainloop.
+    """
+    # Main window
+    root = tk.Toplevel(master) if master is not None else tk.Tk()
+    root.title("J_TECH.COM")
+    root.geometry("350x250")
+    root.resizable(False, False)
+
+
+    # Username label & entry
+    tk.Label(root, text="Username:").pack(pady=5)
+    username_entry = tk.Entry(root, width=30)
+    username_entry.pack(pady=5)
+
+    # Password label & entry
+    tk.Label(root, text="Password:").pack(pady=5)
+    password_entry = tk.Entry(root, show="*", width=30)
+    password_entry.pack(pady=5)
+
+    # Buttons
+    tk.Button(root, text="Login", command=lambda: login(username_entry.get(), password_entry.get()),
+              width=15, bg="blue", fg="white").pack(pady=10)
+    tk.Button(root, text="Register", command=lambda: register(username_entry.get(), password_entry.get()),
+              width=15, bg="green", fg="white").pack(pady=5)
+
+    # Run the application
+    if master is None:
+        root.mainloop()
+    return root
+
+if __name__ == "__main__":
+    run_login()